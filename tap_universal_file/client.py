@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
+import contextlib
+import queue
 import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import cached_property
-from typing import TYPE_CHECKING, Any, Generator, Iterable
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    TypeVar,
+)
 
 import singer_sdk.helpers._typing
 from singer_sdk.streams import Stream
@@ -17,6 +30,14 @@ if TYPE_CHECKING:
     import singer_sdk._singerlib as singer
     from singer_sdk.tap_base import Tap
 
+_T = TypeVar("_T")
+
+# Files read ahead are handed over in batches through a bounded queue, which caps how
+# much of each file is held in memory before it is synced.
+_PREFETCH_BATCH_SIZE = 1000
+_PREFETCH_QUEUE_SIZE = 4
+_PREFETCH_PUT_TIMEOUT = 0.1
+
 
 def patched_is_boolean_type(property_schema: dict) -> bool | None:
     """Return true if the JSON Schema type is a boolean or None if detection fails.
@@ -67,6 +88,9 @@ class FileStream(Stream):
         Raises:
             RuntimeError: If replication config is invalid.
         """
+        # Compression encodings by file name, as files are opened more than once.
+        self._compressions: dict[str, str | None] = {}
+
         # Define starting_replication_key_value based on state, stream_name, and
         # start_date. This has to be done before stream initialization below so that
         # state can be used during the discovery process.
@@ -159,6 +183,30 @@ class FileStream(Stream):
             row.update({"_sdc_last_modified": last_modified})
         return row
 
+    @staticmethod
+    def _pre_process_identity(row: dict[str, Any]) -> dict[str, Any]:
+        """Returns a row unchanged, for coercion strategies that need no processing.
+
+        Args:
+            row: The row to be pre-processed.
+
+        Returns:
+            The row that was passed in.
+        """
+        return row
+
+    @staticmethod
+    def _pre_process_envelope(row: dict[str, Any]) -> dict[str, Any]:
+        """Wraps a row in an envelope with a single top-level field named "record".
+
+        Args:
+            row: The row to be pre-processed.
+
+        Returns:
+            A dictionary containing the row under the key "record".
+        """
+        return {"record": row}
+
     def get_rows(self) -> Generator[dict[str | Any, str | Any], None, None]:
         """Gets rows of all files that should be synced.
 
@@ -171,6 +219,130 @@ class FileStream(Stream):
         msg = "get_rows must be implemented by subclass."
         raise NotImplementedError(msg)
 
+    def _prefetch_files(
+        self,
+        read_file: Callable[[str], Iterator[_T]],
+        prefetch: int,
+    ) -> Generator[tuple[dict, Iterator[_T]], None, None]:
+        """Reads files that should be synced ahead of when they are consumed.
+
+        Files are read on a thread pool so that fetching and parsing upcoming files
+        overlaps with the processing of the current one. Each file is handed over in
+        batches through a bounded queue, so a file being read ahead holds at most
+        `_PREFETCH_QUEUE_SIZE` queued batches, plus the batch being filled, of
+        `_PREFETCH_BATCH_SIZE` items in memory.
+        Files are still yielded in the order provided by the filesystem manager.
+
+        Args:
+            read_file: A function that lazily reads the items of a file, given its name.
+            prefetch: The number of files to read ahead of the current one. If `0`,
+                files are read lazily, one at a time, as they are consumed.
+
+        Yields:
+            A tuple of (file, items), where file is the file's dictionary from the
+            filesystem manager and items is an iterator over the file's items.
+        """
+        files = self.fs_manager.get_files(self.starting_replication_key_value)
+        if prefetch <= 0:
+            for file in files:
+                yield file, read_file(file["name"])
+            return
+        stopped = threading.Event()
+        pending: deque[tuple[dict, queue.Queue, Future[None]]] = deque()
+        # One more worker than files read ahead, as the current file's worker stays
+        # busy until the file has been consumed.
+        with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+            try:
+                for file in files:
+                    batches: queue.Queue = queue.Queue(maxsize=_PREFETCH_QUEUE_SIZE)
+                    future = executor.submit(
+                        self._read_ahead,
+                        read_file,
+                        file["name"],
+                        batches,
+                        stopped,
+                    )
+                    pending.append((file, batches, future))
+                    if len(pending) > prefetch:
+                        next_file, next_batches, _ = pending.popleft()
+                        yield next_file, self._drain_batches(next_batches)
+                while pending:
+                    next_file, next_batches, _ = pending.popleft()
+                    yield next_file, self._drain_batches(next_batches)
+            finally:
+                # Avoid reading files that will never be consumed, such as when the
+                # stream is closed early or a file fails to be read. Workers that are
+                # already running stop at their next attempt to queue a batch.
+                stopped.set()
+                for _, _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _read_ahead(
+        read_file: Callable[[str], Iterator[_T]],
+        file_name: str,
+        batches: queue.Queue,
+        stopped: threading.Event,
+    ) -> None:
+        """Reads the items of a file into a queue, in batches.
+
+        Every entry in the queue is a tuple of (batch, finished, error). The final
+        entry has finished set to `True`, and carries the error that stopped the file
+        from being read, if any.
+
+        Args:
+            read_file: A function that lazily reads the items of a file, given its name.
+            file_name: The name of the file to read.
+            batches: The bounded queue to put batches of items into.
+            stopped: An event which is set once no more batches will be consumed.
+        """
+
+        def put(entry: tuple[list[_T], bool, Exception | None]) -> bool:
+            while not stopped.is_set():
+                try:
+                    batches.put(entry, timeout=_PREFETCH_PUT_TIMEOUT)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        batch: list[_T] = []
+        try:
+            with contextlib.closing(read_file(file_name)) as items:
+                for item in items:
+                    batch.append(item)
+                    if len(batch) == _PREFETCH_BATCH_SIZE:
+                        if not put((batch, False, None)):
+                            return
+                        batch = []
+        except Exception as e:  # noqa: BLE001
+            # The error is raised by the consumer once it reaches this point of the
+            # file, after the items read before it.
+            put((batch, True, e))
+            return
+        put((batch, True, None))
+
+    @staticmethod
+    def _drain_batches(batches: queue.Queue) -> Generator[_T, None, None]:
+        """Yields items from a queue filled by _read_ahead().
+
+        Args:
+            batches: The queue to take batches of items from.
+
+        Raises:
+            Exception: Any error encountered while the file was being read.
+
+        Yields:
+            An item of the file, in the order it was read.
+        """
+        while True:
+            batch, finished, error = batches.get()
+            yield from batch
+            if error is not None:
+                raise error
+            if finished:
+                return
+
     def get_properties(self) -> dict:
         """Gets properties for the purpose of schema generation.
 
@@ -211,6 +383,19 @@ class FileStream(Stream):
             encoding = "xz"
         return encoding
 
+    def _compression_for(self, file_name: str) -> str | None:
+        """Gets the compression encoding for a file, caching the result.
+
+        Args:
+            file_name: The file to determine the encoding of.
+
+        Returns:
+            The result of get_compression() for the file.
+        """
+        if file_name not in self._compressions:
+            self._compressions[file_name] = self.get_compression(file=file_name)
+        return self._compressions[file_name]
+
     def get_records(
         self,
         context: dict | None,  # noqa: ARG002
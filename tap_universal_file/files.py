@@ -2,16 +2,58 @@
 
 from __future__ import annotations
 
+import contextlib
 import datetime
+import io
+import os
 import re
 import tempfile
 from functools import cached_property
-from typing import TYPE_CHECKING, Any, Generator
+from operator import itemgetter
+from typing import IO, TYPE_CHECKING, Any, Generator
 
 if TYPE_CHECKING:
     import logging
 
-import fsspec
+    import fsspec
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Gets literal text that every string matched by a regex pattern must begin with.
+
+    This is deliberately conservative: parsing stops at the first character with a
+    special meaning, and patterns containing alternation have no literal prefix.
+
+    Args:
+        pattern: The regex pattern, as matched from the start of a string.
+
+    Returns:
+        The literal prefix of the pattern, which may be empty.
+    """
+    if "|" in pattern:
+        return ""
+    prefix: list[str] = []
+    i = 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            # Escaped letters and digits are classes or references, not literals.
+            if not escaped or escaped.isalnum():
+                break
+            prefix.append(escaped)
+            i += 2
+            continue
+        if char in "*+?{":
+            # A quantifier makes the preceding character optional or repeated.
+            if prefix:
+                prefix.pop()
+            break
+        if char in ".^$[]()":
+            break
+        prefix.append(char)
+        i += 1
+    return "".join(prefix)
 
 
 class FilesystemManager:
@@ -26,6 +68,10 @@ class FilesystemManager:
         """
         self.config: dict[str, Any] = config
         self.logger: logging.Logger = logger
+        file_regex: str | None = config.get("file_regex")
+        self.file_regex: re.Pattern | None = (
+            re.compile(file_regex) if file_regex else None
+        )
 
     @cached_property
     def protocol(self) -> str:
@@ -42,6 +88,10 @@ class FilesystemManager:
         Returns:
             An fsspec filesystem.
         """
+        # fsspec is imported here so that commands which never touch a filesystem,
+        # such as --about, don't pay the cost of importing it.
+        import fsspec
+
         caching_strategy = self.config["caching_strategy"]
 
         if self.protocol == "file":
@@ -54,13 +104,13 @@ class FilesystemManager:
             return fsspec.filesystem(
                 "filecache",
                 target_protocol=self.protocol,
-                target_options=self._get_args(),
+                target_options=self._args,
             )
         if caching_strategy == "persistent":
             return fsspec.filesystem(
                 "filecache",
                 target_protocol=self.protocol,
-                target_options=self._get_args(),
+                target_options=self._args,
                 cache_storage=tempfile.gettempdir(),
             )
         if caching_strategy == "none":
@@ -69,11 +119,63 @@ class FilesystemManager:
             # as a dictionary.
             return fsspec.filesystem(
                 protocol=self.protocol,
-                **self._get_args(),
+                **self._args,
             )
         msg = f"The caching strategy '{caching_strategy} is invalid."
         raise ValueError(msg)
 
+    @cached_property
+    def search_path(self) -> str:
+        """The path to search for files in.
+
+        This is the configured `file_path`, narrowed to one of its subdirectories when
+        `file_regex` begins with a literal path inside it. Files outside of that
+        subdirectory could never match, so they are never listed. This is especially
+        useful for S3, where listing is done a page of objects at a time.
+
+        Returns:
+            A path to pass to the filesystem's find() method.
+        """
+        file_path: str = self.config["file_path"]
+        if self.file_regex is None:
+            return file_path
+        # Path.resolve() would follow symlinks, which fsspec's local listing doesn't.
+        base = (
+            os.path.abspath(file_path)  # noqa: PTH100
+            if self.protocol == "file"
+            else file_path
+        )
+        directory = _literal_prefix(self.file_regex.pattern).rpartition("/")[0]
+        if directory.startswith(base.rstrip("/") + "/"):
+            return directory
+        return file_path
+
+    def open(self, path: str, mode: str, compression: str | None = None) -> IO:
+        """Opens a file for reading.
+
+        Local files are opened with a hint to the OS that they will be read
+        sequentially, which allows the kernel to read further ahead of the parser when
+        files aren't already cached in memory.
+
+        Args:
+            path: The path of the file to open.
+            mode: The mode to open the file in, either `rt` or `rb`.
+            compression: The compression encoding to decompress the file with, if any.
+
+        Returns:
+            A file-like object.
+        """
+        if self.protocol != "file" or not hasattr(os, "posix_fadvise"):
+            return self.filesystem.open(path=path, mode=mode, compression=compression)
+        from fsspec.compression import compr
+
+        # Mirrors fsspec's own open(), with the raw file exposed so it can be advised.
+        f = self.filesystem.open(path=path, mode="rb")
+        with contextlib.suppress(OSError):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        f = compr[compression](f, mode="r")
+        return f if "b" in mode else io.TextIOWrapper(f)
+
     def get_files(
         self,
         starting_replication_key_value: str | None = None,
@@ -92,60 +194,63 @@ class FilesystemManager:
             The name of a file to be synced, matching a regex pattern, if one has been
                 configured.
         """
-        none_found = True
-        none_synced = True
+        matching_files = []
 
-        file_dict_list = []
+        filesystem = self.filesystem
+        file_regex = self.file_regex
 
-        for file_path in self.filesystem.find(self.config["file_path"]):
-            file = self.filesystem.info(file_path)
-            if (
-                file["type"] == "directory"  # Ignore nested folders.
-                or file["size"] == 0  # Ignore empty files.
-                or (  # Ignore files not matching the configured file_regex
-                    "file_regex" in self.config
-                    and not re.match(
-                        self.config["file_regex"],
-                        file["name"],
-                    )
-                )
-            ):
+        # Details come back with the listing itself, so no per-file info() lookup is
+        # needed, and withdirs=False ensures that nested folders are never returned.
+        for file in filesystem.find(
+            self.search_path,
+            withdirs=False,
+            detail=True,
+        ).values():
+            # Ignore empty files.
+            if file["size"] == 0:
+                continue
+            # Ignore files not matching the configured file_regex
+            if file_regex is not None and not file_regex.match(file["name"]):
                 continue
-            none_found = False
-            file_dict_list.append(
+            matching_files.append(
                 {"name": file["name"], "last_modified": self._get_last_modified(file)},
             )
 
-        # Sort the files so that is_sorted can be True. This allows the tap to pick up
-        # where it left off if interrupted.
-        file_dict_list = sorted(file_dict_list, key=lambda k: k["last_modified"])
-
-        # Only yield files when no replication key is present or when the file is newer
-        # than the replication key value, as a datetime.
-        for file_dict in file_dict_list:
-            if starting_replication_key_value is None or file_dict[
-                "last_modified"
-            ] >= datetime.datetime.strptime(
-                starting_replication_key_value,
-                r"%Y-%m-%dT%H:%M:%S%z",  # ISO-8601
-            ):
-                none_synced = False
-                yield file_dict
-                continue
-
-        if self.config["fail_when_no_files_found"] and none_found:
+        if self.config["fail_when_no_files_found"] and not matching_files:
             msg = (
                 "No files found. Choose a different `file_path` or try a more lenient "
                 "`file_regex`."
             )
             raise RuntimeError(msg)
-        if none_synced:
+
+        # Only sync files when no replication key is present or when the file is newer
+        # than the replication key value, as a datetime.
+        if starting_replication_key_value is None:
+            file_dict_list = matching_files
+        else:
+            cutoff = datetime.datetime.strptime(
+                starting_replication_key_value,
+                r"%Y-%m-%dT%H:%M:%S%z",  # ISO-8601
+            )
+            file_dict_list = [
+                file_dict
+                for file_dict in matching_files
+                if file_dict["last_modified"] >= cutoff
+            ]
+        if not file_dict_list:
             msg = (
                 "Current state precludes files being synced as none have been modified "
                 "since state was last updated."
             )
             self.logger.warning(msg)
 
+        # Sort the files so that is_sorted can be True. This allows the tap to pick up
+        # where it left off if interrupted. Files older than the cutoff have already
+        # been dropped, so only files that will be synced are sorted.
+        file_dict_list.sort(key=itemgetter("last_modified"))
+
+        yield from file_dict_list
+
     def _get_last_modified(self, file: dict) -> datetime.datetime | None:
         """Finds the last modified date from a file dictionary.
 
@@ -165,15 +270,18 @@ class FilesystemManager:
                 datetime.timezone.utc,
             )
         if self.protocol == "s3":
+            # LastModified is part of s3fs's listing results (from ListObjectsV2), so
+            # reading it never requires a separate HeadObject request per file.
             return file["LastModified"]
         msg = f"The protocol '{self.protocol}' is invalid."
         raise ValueError(msg)
 
-    def _get_args(self) -> dict[str, Any]:
-        """Gets the fsspec arguments for a certain set of configuration options.
+    @cached_property
+    def _args(self) -> dict[str, Any]:
+        """The fsspec arguments for a certain set of configuration options.
 
         Some fsspec implementations require additional configuration. The behavior
-        here is abstracted to a dedicated method for two reasons:
+        here is abstracted to a dedicated property for two reasons:
           - When further protocols are added, the logic to determine their arguments
                 would become unwieldy if left in the main method.
           - Creating a consistent dictionary of arguments allows the dictionary to be
@@ -2,21 +2,38 @@
 
 from __future__ import annotations
 
+import contextlib
 import csv
 import decimal
+import itertools
 import json
-import re
-from typing import Any, Generator
+from collections import deque
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable, Generator
 
-import avro
-import avro.datafile
-import avro.io
-import avro.schema
 import pyarrow as pa
 import pyarrow.parquet as pq
 
 from tap_universal_file.client import FileStream
 
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    import avro.datafile
+    import fastavro
+
+# Avro primitive types and the JSON schema types they are converted to.
+_AVRO_TO_JSON_TYPES = {
+    "null": "null",
+    "boolean": "boolean",
+    "string": "string",
+    "int": "integer",
+    "long": "integer",
+    "float": "number",
+    "double": "number",
+    "bytes": "string",
+}
+
 
 class DelimitedStream(FileStream):
     """Stream for reading CSVs and TSVs."""
@@ -27,12 +44,12 @@ class DelimitedStream(FileStream):
         Yields:
             A dictionary containing information about a row in a *SV.
         """
+        add_additional_info = self.add_additional_info
         for reader, file_name, last_modified in self._get_readers():
             self.logger.info("Starting sync of %s.", file_name)
             line_number = 0
-            for row in reader:
-                line_number += 1
-                yield self.add_additional_info(
+            for line_number, row in enumerate(reader, start=1):
+                yield add_additional_info(
                     row=row,
                     file_name=file_name,
                     line_number=line_number,
@@ -63,7 +80,7 @@ class DelimitedStream(FileStream):
                 )
                 raise RuntimeError(msg)
             for field in reader.fieldnames:
-                properties.update({field: {"type": ["null", "string"]}})
+                properties[field] = {"type": ["null", "string"]}
 
         return properties
 
@@ -83,13 +100,17 @@ class DelimitedStream(FileStream):
             "delimited_override_headers",
             None,
         )
+        configured_delimiter: str = self.config["delimited_delimiter"]
 
         for file in self.fs_manager.get_files(self.starting_replication_key_value):
             file_name = file["name"]
-            if self.config["delimited_delimiter"] == "detect":
-                if re.match(".*\\.csv.*", file_name):
+            if configured_delimiter == "detect":
+                # `.csv` or `.tsv` may appear anywhere in the path, so that compressed
+                # files such as `.csv.gz` and Spark-style outputs such as
+                # `exports.csv/part-00000` are both detected.
+                if ".csv" in file_name:
                     delimiter = ","
-                elif re.match(".*\\.tsv.*", file_name):
+                elif ".tsv" in file_name:
                     delimiter = "\t"
                 else:
                     msg = (
@@ -99,7 +120,7 @@ class DelimitedStream(FileStream):
                     )
                     raise RuntimeError(msg)
             else:
-                delimiter = self.config["delimited_delimiter"]
+                delimiter = configured_delimiter
 
             yield (
                 self.ModifiedDictReader(
@@ -114,31 +135,36 @@ class DelimitedStream(FileStream):
                 file["last_modified"],
             )
 
-    def _skip_rows(self, file: str) -> list[str]:
-        """Takes a file name and only returns rows which are not configured as skipped.
+    def _skip_rows(self, file: str) -> Generator[str, None, None]:
+        """Takes a file name and only yields rows which are not configured as skipped.
+
+        Header rows are discarded as they are read and only the trailing
+        `delimited_footer_skip` rows are buffered, so the file is never held in memory
+        in its entirety.
 
         Args:
             file: The name of the file to process.
 
-        Returns:
-            A list containing rows from the file.
+        Yields:
+            A row from the file.
         """
-        with self.fs_manager.filesystem.open(
+        footer_skip: int = self.config["delimited_footer_skip"]
+        with self.fs_manager.open(
             path=file,
             mode="rt",
-            compression=self.get_compression(file=file),
+            compression=self._compression_for(file),
         ) as f:
-            file_list = []
-            file_list.extend(f)
-        try:
             for _ in range(self.config["delimited_header_skip"]):
-                file_list.pop(0)
-            for _ in range(self.config["delimited_footer_skip"]):
-                file_list.pop()
-        except IndexError:
-            return []
-        else:
-            return file_list
+                if next(f, None) is None:
+                    return
+            if footer_skip <= 0:
+                yield from f
+                return
+            footer: deque[str] = deque(maxlen=footer_skip)
+            for line in f:
+                if len(footer) == footer_skip:
+                    yield footer.popleft()
+                footer.append(line)
 
     class ModifiedDictReader(csv.DictReader):
         """A modified version of DictReader that detects improperly formatted rows."""
@@ -155,10 +181,23 @@ class DelimitedStream(FileStream):
             *args: Any,
             **kwds: Any,
         ) -> None:
-            """Identical to the superclass's method except for defining self.config."""
+            """Identical to the superclass's method except for defining self.config.
+
+            The error handling mode is resolved once here rather than on every row.
+            """
             super().__init__(f, fieldnames, restkey, restval, dialect, *args, **kwds)
             self.config = config if config is not None else {}
             self.file_name = file_name
+            self.fail_on_mismatch: bool = (
+                self.config.get("delimited_error_handling") == "fail"
+            )
+            # Blank rows are skipped by filter() itself rather than in __next__. The
+            # underlying reader is kept as self.reader, which the superclass uses to
+            # read headers and both classes use to track line numbers.
+            self.non_blank_rows = filter(None, self.reader)
+            # Headers may be read lazily from the file, so the number of columns is
+            # determined on the first row instead of here.
+            self.field_count: int | None = None
 
         def __next__(self) -> dict:
             """Identical to superclass except for raising formatting errors.
@@ -172,14 +211,17 @@ class DelimitedStream(FileStream):
             """
             if self.line_num == 0:
                 self.fieldnames  # Used for its side-effect. # noqa: B018
-            row = next(self.reader)
+            row = next(self.non_blank_rows)
             self.line_num = self.reader.line_num
-            while row == []:
-                row = next(self.reader)
-            d = dict(zip(self.fieldnames, row))
-            lf = len(self.fieldnames)
+            fieldnames = self.fieldnames
+            lf = self.field_count
+            if lf is None:
+                lf = self.field_count = len(fieldnames)
             lr = len(row)
-            if lf != lr and self.config["delimited_error_handling"] == "fail":
+            d = dict(zip(fieldnames, row))
+            if lf == lr:
+                return d
+            if self.fail_on_mismatch:
                 msg = (
                     f"Error processing {self.file_name} at line {self.line_num}. "
                     f"Total number of column headers ({lf}) doesn't align with the "
@@ -189,8 +231,8 @@ class DelimitedStream(FileStream):
                 raise RuntimeError(msg)
             if lf < lr:
                 d[self.restkey] = row[lf:]
-            elif lf > lr:
-                for key in self.fieldnames[lr:]:
+            else:
+                for key in fieldnames[lr:]:
                     d[key] = self.restval
             return d
 
@@ -204,40 +246,86 @@ class JSONLStream(FileStream):
         Yields:
             A dictionary containing information about a row in a JSONL file.
         """
-        for file in self.fs_manager.get_files(self.starting_replication_key_value):
+        add_additional_info = self.add_additional_info
+        pre_process = self._get_pre_processor()
+        for file, rows in self._prefetch_files(
+            read_file=self._read_rows,
+            prefetch=self.config["jsonl_prefetch_files"],
+        ):
             file_name = file["name"]
+            last_modified = file["last_modified"]
             self.logger.info("Starting sync of %s.", file_name)
-            with self.fs_manager.filesystem.open(
-                path=file_name,
-                mode="rt",
-                compression=self.get_compression(file=file_name),
-            ) as f:
-                line_number = 0
-                for row in f:
-                    line_number += 1
-                    try:
-                        json_row = json.loads(row)
-                    except json.JSONDecodeError as e:
-                        if self.config["jsonl_error_handling"] == "fail":
-                            msg = (
-                                f"Error processing {file_name} at line {line_number}. "
-                                f'JSONDecodeError was "{e}". To suppress this error, '
-                                "change 'jsonl_error_handling' to 'ignore'."
-                            )
-                            raise RuntimeError(msg) from e
-                        continue
-                    yield self.add_additional_info(
-                        row=self._pre_process(json_row),
-                        file_name=file_name,
-                        line_number=line_number,
-                        last_modified=file["last_modified"],
-                    )
+            line_number = 0
+            for line_number, row in rows:
+                yield add_additional_info(
+                    row=pre_process(row),
+                    file_name=file_name,
+                    line_number=line_number,
+                    last_modified=last_modified,
+                )
             self.logger.info(
                 "Completed sync of %s records from %s.",
                 line_number,
                 file_name,
             )
 
+    def _read_rows(
+        self,
+        file_name: str,
+    ) -> Generator[tuple[int, dict[str, Any]], None, None]:
+        """Lazily reads and parses the rows of a JSONL file.
+
+        Args:
+            file_name: The name of the file to read.
+
+        Yields:
+            A tuple of (line_number, row) for each properly formatted row.
+        """
+        fail_on_error = self.config["jsonl_error_handling"] == "fail"
+        with self.fs_manager.open(
+            path=file_name,
+            mode="rt",
+            compression=self._compression_for(file_name),
+        ) as f:
+            for line_number, line in enumerate(f, start=1):
+                row = self._parse_row(line, file_name, line_number, fail_on_error)
+                if row is not None:
+                    yield line_number, row
+
+    def _parse_row(
+        self,
+        line: str,
+        file_name: str,
+        line_number: int,
+        fail_on_error: bool,  # noqa: FBT001
+    ) -> dict[str, Any] | None:
+        """Parses a single line of a JSONL file.
+
+        Args:
+            line: The line to parse.
+            file_name: The name of the file that the line came from.
+            line_number: The line number of the line within its file.
+            fail_on_error: Whether an improperly formatted line should raise an error.
+
+        Raises:
+            RuntimeError: If the line is improperly formatted and fail_on_error is set.
+
+        Returns:
+            A dictionary representing the row, or `None` if the line is improperly
+            formatted and should be ignored.
+        """
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            if fail_on_error:
+                msg = (
+                    f"Error processing {file_name} at line {line_number}. "
+                    f'JSONDecodeError was "{e}". To suppress this error, '
+                    "change 'jsonl_error_handling' to 'ignore'."
+                )
+                raise RuntimeError(msg) from e
+            return None
+
     def get_properties(self) -> dict:
         """Get a list of properties for a JSONL file, to be used in creating a schema.
 
@@ -247,42 +335,33 @@ class JSONLStream(FileStream):
         Returns:
             A list of properties representing a JSONL file.
         """
-        properties = {}
-        for field in self._get_fields():
-            properties.update(self._get_property(field=field))
-        return properties
+        property_type = self._get_property_type()
+        return {field: {"type": list(property_type)} for field in self._get_fields()}
 
-    def _get_property(self, field: str) -> dict[str, dict[str, list[str]]]:
-        """Converts a field into a JSON schema fragment based on coercion strategy.
-
-        Args:
-            field: The name of the field to get a property from.
+    def _get_property_type(self) -> tuple[str, ...]:
+        """Gets the JSON schema type shared by every field based on coercion strategy.
 
         Raises:
             ValueError: If the coercion strategy provided is invalid.
 
         Returns:
-            A dictionary containing a representation of the field as a property.
+            A tuple of JSON schema types to be applied to each field.
         """
         strategy = self.config["jsonl_type_coercion_strategy"]
         if strategy == "any":
-            return {
-                field: {
-                    "type": [
-                        "null",
-                        "boolean",
-                        "integer",
-                        "number",
-                        "string",
-                        "array",
-                        "object",
-                    ],
-                },
-            }
+            return (
+                "null",
+                "boolean",
+                "integer",
+                "number",
+                "string",
+                "array",
+                "object",
+            )
         if strategy == "string":
-            return {field: {"type": ["null", "string"]}}
+            return ("null", "string")
         if strategy == "envelope":
-            return {field: {"type": ["null", "object"]}}
+            return ("null", "object")
         msg = f"The coercion strategy '{strategy}' is not valid."
         raise ValueError(msg)
 
@@ -298,10 +377,17 @@ class JSONLStream(FileStream):
         """
         strategy = self.config["jsonl_sampling_strategy"]
         if strategy == "first":
-            try:
-                yield from next(self.get_rows())
-            except StopIteration:
-                return
+            # Only read as far as the first valid row, rather than syncing through
+            # get_rows(), which would read and parse entire files. Closing the rows
+            # early also closes the file.
+            pre_process = self._get_pre_processor()
+            for file in self.fs_manager.get_files(self.starting_replication_key_value):
+                with contextlib.closing(self._read_rows(file["name"])) as rows:
+                    first_row = next(rows, None)
+                if first_row is not None:
+                    _, row = first_row
+                    yield from pre_process(row)
+                    return
             return
         if strategy == "all":
             msg = f"The sampling strategy '{strategy}' has not been implemented."
@@ -309,31 +395,38 @@ class JSONLStream(FileStream):
         msg = f"The sampling strategy '{strategy}' is not valid."
         raise ValueError(msg)
 
-    def _pre_process(self, row: dict[str, Any]) -> dict[str, Any]:
-        """Processes a row based on the current coercion strategy.
-
-        Args:
-            row: The row to be pre-processed.
+    def _get_pre_processor(self) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """Gets a function that processes a row based on the current coercion strategy.
 
         Raises:
             ValueError: If the coercion strategy provided is invalid.
 
         Returns:
-            A dictionary representing a row, converted or enveloped accordingly based on
-            the coercion strategy that was provided.
+            A function that takes a row and returns it converted or enveloped
+            accordingly based on the coercion strategy that was provided.
         """
         strategy = self.config["jsonl_type_coercion_strategy"]
         if strategy == "any":
-            return row
+            return self._pre_process_identity
         if strategy == "string":
-            for entry in row:
-                row[entry] = str(row[entry])
-            return row
+            return self._pre_process_string
         if strategy == "envelope":
-            return {"record": row}
+            return self._pre_process_envelope
         msg = f"The coercion strategy '{strategy}' is not valid."
         raise ValueError(msg)
 
+    @staticmethod
+    def _pre_process_string(row: dict[str, Any]) -> dict[str, Any]:
+        """Converts every value in a row to a string.
+
+        Args:
+            row: The row to be pre-processed.
+
+        Returns:
+            A new row, with all of the original row's values converted to strings.
+        """
+        return {key: str(value) for key, value in row.items()}
+
 
 class AvroStream(FileStream):
     """Stream for reading Avro files."""
@@ -344,13 +437,14 @@ class AvroStream(FileStream):
         Yields:
             A dictionary containing information about a row in a Avro file.
         """
+        add_additional_info = self.add_additional_info
+        pre_process = self._get_pre_processor()
         for reader, file_name, last_modified in self._get_readers():
             self.logger.info("Starting sync of %s.", file_name)
             line_number = 0
-            for row in reader:
-                line_number += 1
-                yield self.add_additional_info(
-                    row=self._pre_process(row),
+            for line_number, row in enumerate(reader, start=1):
+                yield add_additional_info(
+                    row=pre_process(row),
                     file_name=file_name,
                     line_number=line_number,
                     last_modified=last_modified,
@@ -383,8 +477,18 @@ class AvroStream(FileStream):
         """
         strategy = self.config["avro_type_coercion_strategy"]
         if strategy == "convert":
+            # Files in a stream usually share a schema, so each distinct schema is
+            # only parsed once.
+            parsed_fields: dict[str, list[dict]] = {}
             for reader, _, _ in self._get_readers():
-                yield from json.loads(reader.schema)["fields"]
+                if self._fastavro is not None:
+                    # fastavro readers expose the writer schema already parsed.
+                    yield from reader.writer_schema["fields"]
+                    continue
+                schema = reader.schema
+                if schema not in parsed_fields:
+                    parsed_fields[schema] = json.loads(schema)["fields"]
+                yield from parsed_fields[schema]
             return
         if strategy == "envelope":
             # An eveloped record only has a single top-level field, named "record".
@@ -426,61 +530,77 @@ class AvroStream(FileStream):
         Returns:
             A JSON schema representation of field_type.
         """
-        if not isinstance(field_type, str):
+        json_type = (
+            _AVRO_TO_JSON_TYPES.get(field_type) if isinstance(field_type, str) else None
+        )
+        if json_type is None:
             msg = f"The field type '{field_type}' has not been implemented."
             raise NotImplementedError(msg)
-        if field_type in {"null", "boolean", "string"}:
-            return field_type
-        if field_type in {"int", "long"}:
-            return "integer"
-        if field_type in {"float", "double"}:
-            return "number"
-        if field_type == "bytes":
-            return "string"
-        msg = f"The field type '{field_type} has not been implemented."
-        raise NotImplementedError(msg)
-
-    def _pre_process(self, row: dict[str, Any]) -> dict[str, Any]:
-        """Processes a row based on the current coercion strategy.
+        return json_type
 
-        Args:
-            row: The row to be pre-processed.
+    def _get_pre_processor(self) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """Gets a function that processes a row based on the current coercion strategy.
 
         Raises:
             ValueError: If the coercion strategy provided is invalid.
 
         Returns:
-            A dictionary representing a row, converted or enveloped accordingly based on
-            the coercion strategy that was provided.
+            A function that takes a row and returns it converted or enveloped
+            accordingly based on the coercion strategy that was provided.
         """
         strategy = self.config["avro_type_coercion_strategy"]
         if strategy == "convert":
-            return row
+            return self._pre_process_identity
         if strategy == "envelope":
-            return {"record": row}
+            return self._pre_process_envelope
         msg = f"The coercion strategy '{strategy}' is not valid."
         raise ValueError(msg)
 
+    @cached_property
+    def _fastavro(self) -> ModuleType | None:
+        """The fastavro module, or `None` if it isn't installed."""
+        try:
+            import fastavro
+        except ImportError:
+            return None
+        return fastavro
+
     def _get_readers(
         self,
-    ) -> Generator[tuple[avro.datafile.DataFileReader, str, str], None, None]:
+    ) -> Generator[
+        tuple[fastavro.reader | avro.datafile.DataFileReader, str, str],
+        None,
+        None,
+    ]:
         """Gets reader objects and associated meta data.
 
+        The C-accelerated fastavro reader is used when it is installed. Otherwise,
+        files are read with the pure-Python avro library.
+
         Yields:
-            A tuple of (avro.datafile.DataFileReader, file_name, last_modified).
+            A tuple of (reader, file_name, last_modified), where reader is either a
+            fastavro.reader or an avro.datafile.DataFileReader.
         """
+        # Avro libraries are imported here rather than at module level so that they
+        # aren't loaded unless Avro files are actually being read.
+        fastavro = self._fastavro
+        if fastavro is None:
+            import avro.datafile
+            import avro.io
+
         for file in self.fs_manager.get_files(self.starting_replication_key_value):
             file_name = file["name"]
-            with self.fs_manager.filesystem.open(
+            with self.fs_manager.open(
                 path=file_name,
                 mode="rb",
-                compression=self.get_compression(file=file_name),
+                compression=self._compression_for(file_name),
             ) as f:
-                yield (
-                    avro.datafile.DataFileReader(f, avro.io.DatumReader()),
-                    file_name,
-                    file["last_modified"],
+                reader = (
+                    fastavro.reader(f)
+                    if fastavro is not None
+                    else avro.datafile.DataFileReader(f, avro.io.DatumReader())
                 )
+                yield reader, file_name, file["last_modified"]
 
 
 class ParquetStream(FileStream):
@@ -492,13 +612,19 @@ class ParquetStream(FileStream):
         Yields:
             A dictionary containing information about a row in a Parquet file.
         """
-        for reader, file_name, last_modified in self._get_readers():
+        add_additional_info = self.add_additional_info
+        pre_process = self._get_pre_processor()
+        for file, rows in self._prefetch_files(
+            read_file=self._read_rows,
+            prefetch=self.config["parquet_prefetch_files"],
+        ):
+            file_name = file["name"]
+            last_modified = file["last_modified"]
             self.logger.info("Starting sync of %s.", file_name)
             line_number = 0
-            for row in reader.to_pylist():
-                line_number += 1
-                yield self.add_additional_info(
-                    row=self._pre_process(row),
+            for line_number, row in rows:
+                yield add_additional_info(
+                    row=pre_process(row),
                     file_name=file_name,
                     line_number=line_number,
                     last_modified=last_modified,
@@ -622,30 +748,39 @@ class ParquetStream(FileStream):
             raise NotImplementedError(msg)
         return type_tuple
 
-    def _pre_process(self, row: dict[str, Any]) -> dict[str, Any]:
-        """Processes a row based on the current coercion strategy.
-
-        Args:
-            row: The row to be pre-processed.
+    def _get_pre_processor(self) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """Gets a function that processes a row based on the current coercion strategy.
 
         Raises:
             ValueError: If the coercion strategy provided is invalid.
 
         Returns:
-            A dictionary representing a row, converted or enveloped accordingly based on
-            the coercion strategy that was provided.
+            A function that takes a row and returns it converted or enveloped
+            accordingly based on the coercion strategy that was provided.
         """
         strategy = self.config["parquet_type_coercion_strategy"]
         if strategy == "convert":
-            for k in row:
-                if isinstance(row[k], decimal.Decimal):
-                    row[k] = str(row[k])
-            return row
+            return self._pre_process_decimals
         if strategy == "envelope":
-            return {"record": row}
+            return self._pre_process_envelope
         msg = f"The coercion strategy '{strategy}' is not valid."
         raise ValueError(msg)
 
+    @staticmethod
+    def _pre_process_decimals(row: dict[str, Any]) -> dict[str, Any]:
+        """Converts decimal values in a row to strings.
+
+        Args:
+            row: The row to be pre-processed.
+
+        Returns:
+            The row, with any decimal values converted to strings.
+        """
+        for k in row:
+            if isinstance(row[k], decimal.Decimal):
+                row[k] = str(row[k])
+        return row
+
     def _get_readers(self) -> Generator[tuple[pa.Table, str, str], None, None]:
         """Gets reader objects and associated meta data.
 
@@ -654,13 +789,45 @@ class ParquetStream(FileStream):
         """
         for file in self.fs_manager.get_files(self.starting_replication_key_value):
             file_name = file["name"]
-            with self.fs_manager.filesystem.open(
-                path=file_name,
-                mode="rb",
-                compression=self.get_compression(file=file_name),
-            ) as f:
-                yield (
-                    pq.read_table(source=f),
-                    file_name,
-                    file["last_modified"],
-                )
+            yield (
+                self._read_table(file_name),
+                file_name,
+                file["last_modified"],
+            )
+
+    def _read_rows(
+        self,
+        file_name: str,
+    ) -> Generator[tuple[int, dict[str, Any]], None, None]:
+        """Reads the rows of a Parquet file.
+
+        The file is read into a table in full, but rows are only converted to Python
+        objects one record batch at a time.
+
+        Args:
+            file_name: The name of the file to read.
+
+        Yields:
+            A tuple of (line_number, row) for each row.
+        """
+        table = self._read_table(file_name)
+        rows = itertools.chain.from_iterable(
+            record_batch.to_pylist() for record_batch in table.to_batches()
+        )
+        yield from enumerate(rows, start=1)
+
+    def _read_table(self, file_name: str) -> pa.Table:
+        """Reads a Parquet file into a table.
+
+        Args:
+            file_name: The name of the file to read.
+
+        Returns:
+            A pyarrow.Table containing the file's contents.
+        """
+        with self.fs_manager.open(
+            path=file_name,
+            mode="rb",
+            compression=self._compression_for(file_name),
+        ) as f:
+            return pq.read_table(source=f)
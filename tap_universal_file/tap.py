@@ -18,6 +18,23 @@ if TYPE_CHECKING:
 
 from tap_universal_file import streams
 
+# Stream classes by the file_type they read.
+_STREAM_CLASSES: dict[str, type[streams.FileStream]] = {
+    "delimited": streams.DelimitedStream,
+    "jsonl": streams.JSONLStream,
+    "avro": streams.AvroStream,
+    "parquet": streams.ParquetStream,
+}
+
+# Common but invalid file_type values, and the file_type that was likely intended.
+_FILE_TYPE_SUGGESTIONS = {
+    "csv": "delimited",
+    "tsv": "delimited",
+    "txt": "delimited",
+    "json": "jsonl",
+    "ndjson": "jsonl",
+}
+
 
 def one_of(allowed_values: list) -> str:
     """Creates a string listing allowed values.
@@ -29,16 +46,11 @@ def one_of(allowed_values: list) -> str:
         A string listing each allowed value.
     """
     if len(allowed_values) == 1:
-        return "Must be `" + allowed_values[0] + "`"
+        return f"Must be `{allowed_values[0]}`"
     if len(allowed_values) == 2:  # noqa: PLR2004
-        return (
-            "Must be either `" + allowed_values[0] + "` or `" + allowed_values[1] + "`"
-        )
-    to_return = "Must be one of "
-    for i in range(len(allowed_values) - 1):
-        to_return += "`" + allowed_values[i] + "`, "
-    to_return += "or `" + allowed_values[-1] + "`"
-    return to_return
+        return f"Must be either `{allowed_values[0]}` or `{allowed_values[1]}`"
+    leading_values = ", ".join(f"`{value}`" for value in allowed_values[:-1])
+    return f"Must be one of {leading_values}, or `{allowed_values[-1]}`"
 
 
 class TapUniversalFile(Tap):
@@ -240,6 +252,17 @@ class TapUniversalFile(Tap):
                 "row as a JSON object with no internal schema."
             ),
         ),
+        th.Property(
+            "jsonl_prefetch_files",
+            th.IntegerType,
+            default=0,
+            description=(
+                "The number of jsonl files to read and parse in the background "
+                "while the current file is being synced. Up to 5,000 parsed rows of "
+                "each prefetched file are held in memory until they are synced. By "
+                "default, files are read lazily, one at a time."
+            ),
+        ),
         th.Property(
             "avro_type_coercion_strategy",
             th.StringType,
@@ -268,6 +291,18 @@ class TapUniversalFile(Tap):
                 "schema for the record."
             ),
         ),
+        th.Property(
+            "parquet_prefetch_files",
+            th.IntegerType,
+            default=0,
+            description=(
+                "The number of parquet files to read in the background while the "
+                "current file is being synced. Parquet files are read into memory "
+                "in full, so peak memory use grows with each file read ahead: up "
+                "to this many files in addition to the current one. By default, "
+                "files are read one at a time."
+            ),
+        ),
         th.Property(
             "s3_anonymous_connection",
             th.BooleanType,
@@ -322,19 +357,14 @@ class TapUniversalFile(Tap):
         """
         name = self.config["stream_name"]
         file_type = self.config["file_type"]
-        if file_type == "delimited":
-            return [streams.DelimitedStream(self, name=name)]
-        if file_type == "jsonl":
-            return [streams.JSONLStream(self, name=name)]
-        if file_type == "avro":
-            return [streams.AvroStream(self, name=name)]
-        if file_type == "parquet":
-            return [streams.ParquetStream(self, name=name)]
-        if file_type in {"csv", "tsv", "txt"}:
-            msg = f"'{file_type}' is not a valid file_type. Did you mean 'delimited'?"
-            raise ValueError(msg)
-        if file_type in {"json", "ndjson"}:
-            msg = f"'{file_type}' is not a valid file_type. Did you mean 'jsonl'?"
+        stream_class = _STREAM_CLASSES.get(file_type)
+        if stream_class is not None:
+            return [stream_class(self, name=name)]
+        if file_type in _FILE_TYPE_SUGGESTIONS:
+            msg = (
+                f"'{file_type}' is not a valid file_type. Did you mean "
+                f"'{_FILE_TYPE_SUGGESTIONS[file_type]}'?"
+            )
             raise ValueError(msg)
         msg = f"'{file_type}' is not a valid file_type."
         raise ValueError(msg)
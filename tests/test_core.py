@@ -1,19 +1,23 @@
 """Tests standard tap features using the built-in SDK tests library."""
 # flake8: noqa
-import io
-import json
+import logging
 from collections import defaultdict
-from contextlib import redirect_stdout
 import os
+import re
+import shutil
 from pathlib import Path
 import pytest
 
 from singer_sdk.testing import get_tap_test_class
 
+from tap_universal_file import streams
+from tap_universal_file.files import FilesystemManager, _literal_prefix
 from tap_universal_file.tap import TapUniversalFile
 
 # Helper functions
 
+_DATA_DIR = str(Path(__file__).parent / "data")
+
 
 def data_dir() -> str:
     """Gets the directory in tests/data where data is stored.
@@ -21,7 +25,7 @@ def data_dir() -> str:
     Returns:
         A str representing a file path to tests/data.
     """
-    return str(Path(__file__).parent / Path("./data"))
+    return _DATA_DIR
 
 
 base_file_config = {
@@ -30,6 +34,41 @@ base_file_config = {
 }
 
 
+@pytest.fixture
+def isolated_data_dir(tmp_path: Path) -> str:
+    """Copies tests/data into a temporary directory.
+
+    Tests that modify files should use this so that they don't interfere with other
+    tests reading tests/data, including when tests are run in parallel.
+
+    Returns:
+        A str representing a file path to the copy of tests/data.
+    """
+    return str(shutil.copytree(data_dir(), tmp_path / "data"))
+
+
+class _CapturingTap(TapUniversalFile):
+    """A TapUniversalFile that keeps the messages it writes instead of printing them.
+
+    This spares tests from serializing every message to stdout only to parse it back.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.schema_messages: list[dict] = []
+        self.record_messages: list[dict] = []
+        self.state_messages: list[dict] = []
+        super().__init__(*args, **kwargs)
+
+    def write_message(self, message) -> None:
+        message_dict = message.to_dict()
+        if message_dict["type"] == "STATE":
+            self.state_messages.append(message_dict)
+        elif message_dict["type"] == "SCHEMA":
+            self.schema_messages.append(message_dict)
+        elif message_dict["type"] == "RECORD":
+            self.record_messages.append(message_dict)
+
+
 def execute_tap(config: dict = None):
     """Executes a TapUniversalFile tap.
 
@@ -40,44 +79,28 @@ def execute_tap(config: dict = None):
         A dictionary containing messages about the tap's invocation, including, schema,
         records (both messages about them and the records themselves), and state.
     """
-    schema_messages: list[dict] = []
-    record_messages: list[dict] = []
-    state_messages: list[dict] = []
     records: defaultdict = defaultdict(list)
 
-    stdout_buf = io.StringIO()
-    with redirect_stdout(stdout_buf):
-        tap_config = config if config is not None else {}
-        TapUniversalFile(config=tap_config).run_sync_dry_run(dry_run_record_limit=None)
-    stdout_buf.seek(0)
-
-    for message in [
-        json.loads(line) for line in stdout_buf.read().strip().split("\n") if line
-    ]:
-        if message:
-            if message["type"] == "STATE":
-                state_messages.append(message)
-                continue
-            if message["type"] == "SCHEMA":
-                schema_messages.append(message)
-                continue
-            if message["type"] == "RECORD":
-                stream_name = message["stream"]
-                record_messages.append(message)
-                records[stream_name].append(message["record"])
-                continue
+    tap_config = config if config is not None else {}
+    tap = _CapturingTap(config=tap_config)
+    tap.run_sync_dry_run(dry_run_record_limit=None)
+
+    for message in tap.record_messages:
+        records[message["stream"]].append(message["record"])
     return {
-        "schema_messages": schema_messages,
-        "record_messages": record_messages,
-        "state_messages": state_messages,
+        "schema_messages": tap.schema_messages,
+        "record_messages": tap.record_messages,
+        "state_messages": tap.state_messages,
         "records": records,
     }
 
 
 # Run standard built-in tap tests from the SDK on a simple csv.
 
-sample_config = base_file_config.copy()
-sample_config.update({"file_regex": "^.*fruit_records\\.csv"})
+sample_config = {
+    **base_file_config,
+    "file_regex": "^.*fruit_records\\.csv.*$",
+}
 
 TestTapUniversalFile = get_tap_test_class(
     tap_class=TapUniversalFile,
@@ -88,10 +111,11 @@ TestTapUniversalFile = get_tap_test_class(
 
 
 def test_sdc_fields_present():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {"file_regex": "^.*fruit_records\\.csv$", "additional_info": True}
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*fruit_records\\.csv$",
+        "additional_info": True,
+    }
     messages = execute_tap(modified_config)
     properties = messages["schema_messages"][0]["schema"]["properties"]
     assert properties["_sdc_line_number"], "_sdc_line_number is not present in schema"
@@ -99,10 +123,11 @@ def test_sdc_fields_present():
 
 
 def test_sdc_fields_not_present():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {"file_regex": "^.*fruit_records\\.csv$", "additional_info": False}
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*fruit_records\\.csv$",
+        "additional_info": False,
+    }
     messages = execute_tap(modified_config)
     properties = messages["schema_messages"][0]["schema"]["properties"]
     assert "_sdc_line_number" not in properties, "_sdc_line_number is present in schema"
@@ -110,38 +135,35 @@ def test_sdc_fields_not_present():
 
 
 def test_delimited_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {"file_type": "delimited", "file_regex": "^.*fruit_records\\.csv$"},
-    )
+    modified_config = {
+        **base_file_config,
+        "file_type": "delimited",
+        "file_regex": "^.*fruit_records\\.csv$",
+    }
     execute_tap(modified_config)
 
 
 def test_jsonl_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_type": "jsonl",
-            "file_regex": "^.*\\/employees\\.jsonl$",
-            "jsonl_sampling_strategy": "first",
-            "jsonl_type_coercion_strategy": "string",
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_type": "jsonl",
+        "file_regex": "^.*\\/employees\\.jsonl$",
+        "jsonl_sampling_strategy": "first",
+        "jsonl_type_coercion_strategy": "string",
+    }
     execute_tap(modified_config)
 
 
 def test_jsonl_execution_coercion_any():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_type": "jsonl",
-            "file_regex": "^.*\\/birds\\.jsonl$",
-            "jsonl_sampling_strategy": "first",
-            "jsonl_type_coercion_strategy": "any",
-            "stream_name": "birds",
-            "additional_info": False,
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_type": "jsonl",
+        "file_regex": "^.*\\/birds\\.jsonl$",
+        "jsonl_sampling_strategy": "first",
+        "jsonl_type_coercion_strategy": "any",
+        "stream_name": "birds",
+        "additional_info": False,
+    }
     messages = execute_tap(modified_config)
     record = messages["records"]["birds"][0]
     properties = messages["schema_messages"][0]["schema"]["properties"]
@@ -213,42 +235,105 @@ def test_jsonl_execution_coercion_any():
     assert record == expected_record
 
 
+def test_jsonl_prefetch_matches_sequential():
+    modified_config = {
+        **base_file_config,
+        "file_type": "jsonl",
+        "file_regex": "^.*\\/(birds|employees)\\.jsonl$",
+        "jsonl_type_coercion_strategy": "envelope",
+    }
+    prefetched = execute_tap({**modified_config, "jsonl_prefetch_files": 4})
+    sequential = execute_tap(modified_config)
+    assert prefetched["records"]["file"], "No records returned"
+    assert prefetched["records"] == sequential["records"]
+
+
 def test_avro_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_type": "avro",
-            "file_regex": "^.*athletes\\.avro$",
-            "avro_type_coercion_strategy": "convert",
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_type": "avro",
+        "file_regex": "^.*athletes\\.avro$",
+        "avro_type_coercion_strategy": "convert",
+    }
     execute_tap(modified_config)
 
 
-def test_parquet_convert_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_type": "parquet",
-            "file_regex": "^.*racing\\.parquet$",
-            "parquet_type_coercion_strategy": "convert",
-        },
+def test_avro_fallback_matches_fastavro(monkeypatch):
+    pytest.importorskip("fastavro")
+    modified_config = {
+        **base_file_config,
+        "file_type": "avro",
+        "file_regex": "^.*athletes\\.avro$",
+        "avro_type_coercion_strategy": "convert",
+    }
+    with_fastavro = execute_tap(modified_config)
+    monkeypatch.setattr(streams.AvroStream, "_fastavro", None)
+    without_fastavro = execute_tap(modified_config)
+    assert (
+        with_fastavro["schema_messages"][0]["schema"]
+        == without_fastavro["schema_messages"][0]["schema"]
     )
+    assert with_fastavro["records"] == without_fastavro["records"]
+
+
+def test_parquet_convert_execution():
+    modified_config = {
+        **base_file_config,
+        "file_type": "parquet",
+        "file_regex": "^.*racing\\.parquet$",
+        "parquet_type_coercion_strategy": "convert",
+    }
     execute_tap(modified_config)
 
 
 def test_parquet_envelope_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_type": "parquet",
-            "file_regex": "^.*racing\\.parquet$",
-            "parquet_type_coercion_strategy": "envelope",
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_type": "parquet",
+        "file_regex": "^.*racing\\.parquet$",
+        "parquet_type_coercion_strategy": "envelope",
+    }
     execute_tap(modified_config)
 
 
+def test_literal_regex_prefix_narrows_search():
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^"
+        + re.escape(data_dir() + "/heart_partition/partition=3/")
+        + ".*\\.parquet$",
+    }
+    fs_manager = FilesystemManager(modified_config, logging.getLogger())
+    assert fs_manager.search_path == data_dir() + "/heart_partition/partition=3"
+
+
+def test_regex_without_literal_prefix_searches_file_path():
+    modified_config = {**base_file_config, "file_regex": "^.*partition=3/.*$"}
+    fs_manager = FilesystemManager(modified_config, logging.getLogger())
+    assert fs_manager.search_path == data_dir()
+
+
+def test_literal_prefix():
+    assert _literal_prefix("^\\/a\\/b\\.c") == "/a/b.c"
+    assert _literal_prefix("/a/bc?/") == "/a/b"
+    assert _literal_prefix("/a/b|/c/d") == ""
+    assert _literal_prefix("(?i)/a/b") == ""
+    assert _literal_prefix("/a/\\d+") == "/a/"
+
+
+def test_parquet_prefetch_matches_sequential():
+    modified_config = {
+        **base_file_config,
+        "file_type": "parquet",
+        "file_regex": "^.*heart_partition.*\\.parquet$",
+        "parquet_type_coercion_strategy": "envelope",
+    }
+    prefetched = execute_tap({**modified_config, "parquet_prefetch_files": 4})
+    sequential = execute_tap(modified_config)
+    assert prefetched["records"]["file"], "No records returned"
+    assert prefetched["records"] == sequential["records"]
+
+
 def test_s3_execution():
     s3_config = {
         "protocol": "s3",
@@ -259,89 +344,110 @@ def test_s3_execution():
 
 
 def test_compression_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_regex": "^.*fruit_records",
-            "compression": "detect",
-            "delimited_delimiter": ",",
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*fruit_records\\..+$",
+        "compression": "detect",
+        "delimited_delimiter": ",",
+    }
     execute_tap(modified_config)
 
 
 def test_header_footer_execution():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_regex": "^.*cats\\.csv$",
-            "delimited_header_skip": 3,
-            "delimited_footer_skip": 3,
-        },
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*cats\\.csv$",
+        "delimited_header_skip": 3,
+        "delimited_footer_skip": 3,
+    }
     execute_tap(modified_config)
 
 
+def test_header_footer_skips_rows():
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*cats\\.csv$",
+        "delimited_header_skip": 3,
+        "delimited_footer_skip": 3,
+        "stream_name": "cats",
+    }
+    messages = execute_tap(modified_config)
+    assert [record["name"] for record in messages["records"]["cats"]] == [
+        "House Cat",
+        "Lion",
+        "Tiger",
+    ]
+
+
 def test_malformed_delimited_fail():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {"file_regex": "^.*cats\\.csv$", "delimited_error_handling": "fail"}
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*cats\\.csv$",
+        "delimited_error_handling": "fail",
+    }
     with pytest.raises(RuntimeError, match="^Error processing.*"):
         execute_tap(modified_config)
 
 
 def test_malformed_delimited_ignore():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {"file_regex": "^.*cats\\.csv$", "delimited_error_handling": "ignore"}
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*cats\\.csv$",
+        "delimited_error_handling": "ignore",
+    }
     execute_tap(modified_config)
 
 
 def test_malformed_jsonl_fail():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_regex": "^.*malformed_employees\\.jsonl$",
-            "file_type": "jsonl",
-            "jsonl_error_handling": "fail",
-            "jsonl_type_coercion_strategy": "string",
-        }
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*malformed_employees\\.jsonl$",
+        "file_type": "jsonl",
+        "jsonl_error_handling": "fail",
+        "jsonl_type_coercion_strategy": "string",
+    }
+    with pytest.raises(RuntimeError, match="^Error processing.*"):
+        execute_tap(modified_config)
+
+
+def test_malformed_jsonl_fail_with_prefetch():
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*malformed_employees\\.jsonl$",
+        "file_type": "jsonl",
+        "jsonl_error_handling": "fail",
+        "jsonl_type_coercion_strategy": "string",
+        "jsonl_prefetch_files": 4,
+    }
     with pytest.raises(RuntimeError, match="^Error processing.*"):
         execute_tap(modified_config)
 
 
 def test_malformed_jsonl_ignore():
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "file_regex": "^.*malformed_employees\\.jsonl$",
-            "file_type": "jsonl",
-            "jsonl_error_handling": "ignore",
-            "jsonl_type_coercion_strategy": "string",
-        }
-    )
+    modified_config = {
+        **base_file_config,
+        "file_regex": "^.*malformed_employees\\.jsonl$",
+        "file_type": "jsonl",
+        "jsonl_error_handling": "ignore",
+        "jsonl_type_coercion_strategy": "string",
+    }
     execute_tap(modified_config)
 
 
-def test_incremental_sync():
-    os.utime(data_dir() + "/old_hardware.csv", (1641124800, 1641124800))
-    os.utime(data_dir() + "/new_hardware.csv", (1641211200, 1641211200))
-    modified_config = base_file_config.copy()
-    modified_config.update(
-        {
-            "stream_name": "file",
-            "file_regex": ".*hardware\\.csv$",
-            "file_type": "delimited",
-        }
-    )
+def test_incremental_sync(isolated_data_dir):
+    os.utime(isolated_data_dir + "/old_hardware.csv", (1641124800, 1641124800))
+    os.utime(isolated_data_dir + "/new_hardware.csv", (1641211200, 1641211200))
+    modified_config = {
+        **base_file_config,
+        "file_path": isolated_data_dir,
+        "stream_name": "file",
+        "file_regex": "^.*hardware\\.csv$",
+        "file_type": "delimited",
+    }
     messages = execute_tap(modified_config)
     assert len(messages["records"]["file"]) == 10, "Improper number of records returned"
     start_date = messages["state_messages"][0]["value"]["bookmarks"]["file"][
         "replication_key_value"
     ]
-    modified_config.update({"start_date": start_date})
-    messages = execute_tap(modified_config)
+    messages = execute_tap({**modified_config, "start_date": start_date})
     assert len(messages["records"]["file"]) == 5, "Improper number of records returned"